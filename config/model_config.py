@@ -14,3 +14,6 @@ TEMPERATURE = 0.7
 TOP_P = 0.6
 TOP_K = 20
 REPETITION_PENALTY = 1.05
+
+# 批量翻译时每批字幕条数
+BATCH_SIZE = 8
@@ -1,4 +1,3 @@
-import glob
 import os
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -10,11 +9,22 @@ SUBTITLE_DIR = os.path.join(DATA_DIR, "subtitles")
 VIDEO_DIR = os.path.join(DATA_DIR, "videos")
 VECTOR_DB_DIR = os.path.join(DATA_DIR, "vector_db")
 
+# 译文缓存（跨次运行复用）
+TRANSLATION_CACHE_PATH = os.path.join(DATA_DIR, "translation_cache.sqlite")
+
 # 知识库目录
 KNOWLEDGE_BASE_DIR = os.path.join(BASE_DIR, "rag", "knowledge_base")
 
 # 获取该目录下所有 .txt 文件（可按需添加其他扩展名）
-KNOWLEDGE_FILES = glob.glob(os.path.join(KNOWLEDGE_BASE_DIR, "*.txt"))
+# 与 glob("*.txt") 一致：跳过以 "." 开头的文件（如 macOS 的 ._*.txt）
+KNOWLEDGE_FILES = []
+
+if os.path.isdir(KNOWLEDGE_BASE_DIR):
+    with os.scandir(KNOWLEDGE_BASE_DIR) as it:
+        KNOWLEDGE_FILES = [
+            e.path for e in it
+            if e.name.endswith(".txt") and not e.name.startswith(".") and e.is_file()
+        ]
 
 # RAG配置
 TOP_K = 3
@@ -1,4 +1,10 @@
-from config.settings import KNOWLEDGE_FILES
+import hashlib
+import os
+import re
+import sqlite3
+
+from config.model_config import BATCH_SIZE
+from config.settings import KNOWLEDGE_FILES, TRANSLATION_CACHE_PATH
 from rag.rag_engine import RAGEngine
 from .context import ContextManager
 from .memory.long_term import LongTermMemory
@@ -6,13 +12,18 @@ from .reasoning.translator_chain import TranslatorChain
 
 
 class AISpiderAgent:
-    def __init__(self, model_path, context_size=3, knowledge_files=None, rebuild_lm=False, rebuild_rag=False):
+    # 纯标点/空白或 [Music]、(laughs) 之类的标注无需翻译，原样保留
+    _SKIP_RE = re.compile(r'^[\s\W_]*$|^\[[^\]]*\]$|^\([^)]*\)$')
+
+    def __init__(self, model_path, context_size=3, knowledge_files=None, rebuild_lm=False, rebuild_rag=False,
+                 batch_size=BATCH_SIZE):
         """
         :param model_path: 翻译模型路径
         :param context_size: 上下文窗口大小
         :param knowledge_files: 自定义知识文件列表（如果为 None，则使用默认 KNOWLEDGE_FILES）
         :param rebuild_lm: 是否强制重建 LongTermMemory 索引
         :param rebuild_rag: 是否强制重建 RAGEngine 索引
+        :param batch_size: 模型批量推理大小
         """
         self.context = ContextManager(size=context_size)
 
@@ -23,21 +34,135 @@ class AISpiderAgent:
         self.long_memory = LongTermMemory(kb_files, rebuild=rebuild_lm)
         self.rag_engine = RAGEngine(rebuild=rebuild_rag, knowledge_files=kb_files)
 
-        self.translator = TranslatorChain(model_path)
+        self.translator = TranslatorChain(model_path, batch_size=batch_size)
+
+        # 译文缓存，ASR 字幕中重复的短句只翻译一次
+        self._cache = {}
+
+        # 磁盘缓存，重复处理同一视频时跳过推理
+        # 译文依赖检索到的术语，知识库内容变化后缓存自动失效
+        self._model_fingerprint = self._model_fingerprint_of(model_path)
+        self._kb_fingerprint = self._knowledge_fingerprint(kb_files)
+        os.makedirs(os.path.dirname(TRANSLATION_CACHE_PATH), exist_ok=True)
+        self._cache_db = sqlite3.connect(TRANSLATION_CACHE_PATH)
+        self._cache_db.execute(
+            "CREATE TABLE IF NOT EXISTS translations (key TEXT PRIMARY KEY, value TEXT)"
+        )
+
+    @staticmethod
+    def _model_fingerprint_of(model_path):
+        """
+        按模型配置与权重文件计算模型指纹，同名目录下的不同权重不会共用缓存
+        （非本地目录时退化为规范化后的路径）
+        """
+        model_dir = os.path.abspath(model_path)
+
+        if not os.path.isdir(model_dir):
+            return hashlib.sha1(os.path.normpath(model_path).encode("utf-8")).hexdigest()
+
+        h = hashlib.sha1()
+
+        for name in sorted(os.listdir(model_dir)):
+            path = os.path.join(model_dir, name)
+
+            if name == "config.json" or name.endswith(".index.json"):
+                # 配置和权重索引直接按内容计算
+                with open(path, "rb") as f:
+                    h.update(name.encode("utf-8") + b"\0" + f.read())
+            elif name.endswith((".safetensors", ".bin")):
+                # 权重文件体积大，按文件名和大小区分
+                h.update(f"{name}:{os.path.getsize(path)}".encode("utf-8"))
+
+        return h.hexdigest()
+
+    @staticmethod
+    def _knowledge_fingerprint(kb_files):
+        """按文件内容计算知识库指纹（与文件路径和顺序无关）"""
+        if isinstance(kb_files, str):
+            kb_files = [kb_files]
+
+        digests = []
+
+        for path in kb_files:
+            if not os.path.exists(path):
+                continue
+            with open(path, "rb") as f:
+                digests.append(hashlib.sha1(f.read()).hexdigest())
+
+        return hashlib.sha1("|".join(sorted(digests)).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _cache_key(text):
+        # 保留大小写，避免 "US"/"us"、"May"/"may" 共用译文
+        return text.strip()
+
+    def _db_key(self, key):
+        raw = f"{self._model_fingerprint}|{self._kb_fingerprint}|en|zh|{key}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _lookup(self, key):
+        """依次查询内存缓存和磁盘缓存，未命中返回 None"""
+        if key in self._cache:
+            return self._cache[key]
+
+        row = self._cache_db.execute(
+            "SELECT value FROM translations WHERE key = ?", (self._db_key(key),)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        self._cache[key] = row[0]
+        return row[0]
+
+    def _store(self, key, result):
+        self._cache[key] = result
+        self._cache_db.execute(
+            "INSERT OR REPLACE INTO translations (key, value) VALUES (?, ?)",
+            (self._db_key(key), result)
+        )
+
+    def save_cache(self):
+        """将新增译文写入磁盘缓存"""
+        self._cache_db.commit()
+
+    def close(self):
+        """提交未保存的译文并关闭磁盘缓存"""
+        self._cache_db.commit()
+        self._cache_db.close()
+
+    def _retrieve_knowledge(self, text):
+        return self._retrieve_knowledge_batch([text])[0]
+
+    def _retrieve_knowledge_batch(self, texts):
+        # 每个向量库对整批文本只做一次编码
+        long_knowledge_lists = self.long_memory.retrieve_batch(texts)
+        rag_knowledge_lists = self.rag_engine.search_batch_as_list(texts)
+
+        knowledges = []
+
+        for long_knowledge_list, rag_knowledge_list in zip(long_knowledge_lists, rag_knowledge_lists):
+            # 合并两个列表并去重
+            combined = set(long_knowledge_list)
+            combined.update(rag_knowledge_list)
+            knowledges.append("\n".join(combined))
+
+        return knowledges
 
     def translate_sentence(self, text):
-        context = self.context.get_context()
+        if self._SKIP_RE.match(text.strip()):
+            self.context.add(text)
+            return text
 
-        # 从 LongTermMemory 检索（返回列表）
-        long_knowledge_list = self.long_memory.retrieve(text)
+        key = self._cache_key(text)
+        cached = self._lookup(key)
 
-        # 从 RAGEngine 检索（返回拼接字符串，按行分割成列表）
-        rag_knowledge_str = self.rag_engine.search(text)
-        rag_knowledge_list = rag_knowledge_str.split("\n") if rag_knowledge_str else []
+        if cached is not None:
+            self.context.add(text)
+            return cached
 
-        # 合并两个列表并去重
-        combined = list(set(long_knowledge_list + rag_knowledge_list))
-        knowledge = "\n".join(combined)
+        context = self.context.get_context()
+        knowledge = self._retrieve_knowledge(text)
 
         result = self.translator.translate(
             text=text,
@@ -45,5 +170,49 @@ class AISpiderAgent:
             knowledge=knowledge
         )
 
+        self._store(key, result)
+        self.save_cache()
         self.context.add(text)
         return result
+
+    def translate_batch(self, texts):
+        """
+        批量翻译一组连续字幕，上下文按原文顺序逐句推进
+        """
+        keys = [self._cache_key(t) for t in texts]
+        skips = [bool(self._SKIP_RE.match(k)) for k in keys]
+
+        # 只有未命中缓存（且批内首次出现）的句子需要推理
+        misses = []
+        contexts = []
+        seen = set()
+
+        for text, key, skip in zip(texts, keys, skips):
+            if not skip and key not in seen and self._lookup(key) is None:
+                seen.add(key)
+                misses.append(text)
+                contexts.append(self.context.get_context())
+            self.context.add(text)
+
+        if misses:
+            knowledges = self._retrieve_knowledge_batch(misses)
+
+            inputs = [
+                {"text": t, "context": c, "knowledge": k}
+                for t, c, k in zip(misses, contexts, knowledges)
+            ]
+
+            try:
+                outputs = self.translator.translate_batch(inputs)
+            except Exception as e:
+                # 批量失败时逐句回退
+                print(f"批量翻译失败，逐句重试: {e}")
+                outputs = [self.translator.translate(**item) for item in inputs]
+
+            for text, zh in zip(misses, outputs):
+                self._store(self._cache_key(text), zh)
+
+        return [
+            text if skip else self._cache[key]
+            for text, key, skip in zip(texts, keys, skips)
+        ]
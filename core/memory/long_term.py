@@ -18,3 +18,7 @@ class LongTermMemory:
     def retrieve(self, query, k=3):
         """检索最相关的 k 条知识"""
         return self.vector_memory.search(query, k=k)
+
+    def retrieve_batch(self, queries, k=3):
+        """批量检索，每条查询返回最相关的 k 条知识"""
+        return self.vector_memory.search_batch(queries, k=k)
@@ -50,3 +50,15 @@ class VectorStore:
         """
         docs = self.vector_db.similarity_search(query, k=k)
         return [doc.page_content for doc in docs]
+
+    def search_batch(self, queries: List[str], k: int = 3) -> List[List[str]]:
+        """
+        批量搜索：一次前向计算得到所有查询向量，再逐条检索
+        :return: 与 queries 顺序一致的文本列表
+        """
+        vectors = self.embeddings.embed_documents(queries)
+
+        return [
+            [doc.page_content for doc in self.vector_db.similarity_search_by_vector(v, k=k)]
+            for v in vectors
+        ]
@@ -1,30 +1,77 @@
+import threading
+
 from langchain_huggingface import HuggingFacePipeline
 from transformers import pipeline
 
+from config.model_config import BATCH_SIZE
 from .prompt_templates import TRANSLATION_PROMPT
 
 
+# 已加载的模型按 (路径, 批大小) 复用，避免每次任务重复加载权重
+# 值为 (pipe, 推理锁)：WebUI 多任务线程共享同一模型，推理需串行
+_PIPELINES = {}
+_PIPELINES_LOCK = threading.Lock()
+
+
+def _load_pipeline(model_path, batch_size):
+    key = (model_path, batch_size)
+
+    with _PIPELINES_LOCK:
+        entry = _PIPELINES.get(key)
+
+        if entry is None:
+            # batch_size 必须传给 transformers pipeline，否则仍逐条生成
+            pipe = pipeline(
+                "text-generation",
+                model=model_path,
+                device=0,
+                max_new_tokens=200,
+                batch_size=batch_size,
+            )
+
+            # 批量生成需要左侧填充
+            if pipe.tokenizer.pad_token is None:
+                pipe.tokenizer.pad_token = pipe.tokenizer.eos_token
+            pipe.tokenizer.padding_side = "left"
+
+            entry = (pipe, threading.Lock())
+            _PIPELINES[key] = entry
+
+        return entry
+
+
 class TranslatorChain:
 
-    def __init__(self, model_path):
-        pipe = pipeline(
-            "text-generation",
-            model=model_path,
-            device=0,
-            max_new_tokens=200,
-        )
+    def __init__(self, model_path, batch_size=BATCH_SIZE):
+        pipe, self._infer_lock = _load_pipeline(model_path, batch_size)
 
-        self.llm = HuggingFacePipeline(pipeline=pipe)
+        self.llm = HuggingFacePipeline(pipeline=pipe, batch_size=batch_size)
 
         self.chain = TRANSLATION_PROMPT | self.llm
 
     def translate(self, text, context="", knowledge=""):
-        result = self.chain.invoke({
-            "text": text,
-            "context": context,
-            "knowledge": knowledge
-        })
+        with self._infer_lock:
+            result = self.chain.invoke({
+                "text": text,
+                "context": context,
+                "knowledge": knowledge
+            })
+
+        return self._clean_output(result)
+
+    def translate_batch(self, inputs):
+        """
+        批量翻译
+        :param inputs: 字典列表，每项包含 text / context / knowledge
+        :return: 与 inputs 顺序一致的译文列表
+        """
+        with self._infer_lock:
+            results = self.chain.batch(inputs)
+
+        return [self._clean_output(r) for r in results]
 
+    @staticmethod
+    def _clean_output(result):
         output = result.strip()
 
         # 只提取翻译部分
@@ -1,5 +1,6 @@
 import os
 
+from config.model_config import BATCH_SIZE
 from core.agent import AISpiderAgent
 from tools.subtitle_processor import SubtitleProcessor
 from tools.subtitle_writer import SubtitleWriter
@@ -7,13 +8,14 @@ from tools.youtube_downloader import YouTubeDownloader
 
 
 class TranslationPipeline:
-    def __init__(self, model_path, context_size=3, knowledge_files=None):
+    def __init__(self, model_path, context_size=3, knowledge_files=None, batch_size=BATCH_SIZE):
         self.downloader = YouTubeDownloader()
         self.processor = SubtitleProcessor()
         self.writer = SubtitleWriter()
         self.model_path = model_path
         self.context_size = context_size
         self.knowledge_files = knowledge_files  # 保存，供 run 中使用
+        self.batch_size = batch_size
 
     def run(self, url):
         # 1 下载字幕和视频
@@ -37,26 +39,34 @@ class TranslationPipeline:
             context_size=self.context_size,
             knowledge_files=self.knowledge_files,
             rebuild_lm=False,  # 可根据需要改为参数传递
-            rebuild_rag=True  # 每次使用自定义知识库时建议重建
+            rebuild_rag=True,  # 每次使用自定义知识库时建议重建
+            batch_size=self.batch_size
         )
 
-        translated = []
-
-        # 3 逐句翻译
-        print("\n\n翻译字幕...")
-        for s in subtitles:
-            zh = agent.translate_sentence(s.text)
-            translated.append(zh)
-
-        # 4 输出路径
+        # 3 输出路径
         base, ext = os.path.splitext(subtitle_file)
         bilingual_path = base + "_bilingual" + ext
         chinese_path = base + "_zh" + ext
 
-        # 5 写入字幕
-        print("\n\n写入字幕...")
-        self.writer.write_bilingual(subtitles, translated, bilingual_path)
-        self.writer.write_chinese(subtitles, translated, chinese_path)
+        # 4 分批翻译，每批完成后立即写入字幕
+        print("\n\n翻译字幕...")
+        total = len(subtitles)
+
+        try:
+            with self.writer.open_srt(bilingual_path) as bilingual_file, \
+                    self.writer.open_srt(chinese_path) as chinese_file:
+
+                for i in range(0, total, self.batch_size):
+                    batch = subtitles[i:i + self.batch_size]
+                    translated = agent.translate_batch([s.text for s in batch])
+                    agent.save_cache()
+
+                    self.writer.append_bilingual(bilingual_file, batch, translated)
+                    self.writer.append_chinese(chinese_file, batch, translated)
+
+                    print(f"已翻译 {min(i + self.batch_size, total)}/{total}")
+        finally:
+            agent.close()
 
         print("翻译完成")
         print("双语字幕:", bilingual_path)
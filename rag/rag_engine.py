@@ -85,3 +85,14 @@ class RAGEngine:
     def search_as_list(self, query, k=3):
         results = self.vector_db.similarity_search(query, k=k)
         return [r.page_content for r in results]
+
+    def search_batch_as_list(self, queries, k=3):
+        """
+        批量检索：一次编码所有查询，再按向量逐条检索
+        """
+        vectors = self.embedding.embed_documents(queries)
+
+        return [
+            [r.page_content for r in self.vector_db.similarity_search_by_vector(v, k=k)]
+            for v in vectors
+        ]
@@ -1,17 +1,47 @@
 import os
 import re
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List
 
 from config.settings import SUBTITLE_DIR
 
 
-@dataclass
+def time_to_ms(t: str) -> int:
+
+    # 标准格式 HH:MM:SS,mmm 按固定偏移直接切片
+    if len(t) == 12 and t[2] == ":" and t[5] == ":" and t[8] == ",":
+        return (
+                int(t[0:2]) * 3600000 +
+                int(t[3:5]) * 60000 +
+                int(t[6:8]) * 1000 +
+                int(t[9:12])
+        )
+
+    h, m, rest = t.split(":")
+    s, ms = rest.split(",")
+
+    return (
+            int(h) * 3600000 +
+            int(m) * 60000 +
+            int(s) * 1000 +
+            int(ms)
+    )
+
+
+@dataclass(slots=True)
 class Subtitle:
     idx: int
     start: str
     end: str
     text: str
+    # 由时间字符串派生的毫秒值，保证两者一致
+    start_ms: int = field(init=False)
+    end_ms: int = field(init=False)
+
+    def __post_init__(self):
+
+        self.start_ms = time_to_ms(self.start)
+        self.end_ms = time_to_ms(self.end)
 
 
 class SubtitleProcessor:
@@ -19,6 +49,11 @@ class SubtitleProcessor:
     字幕预处理模块
     """
 
+    # 预编译的正则：SRT 块分隔 / 断句
+    _BLOCK_RE = re.compile(r'\n\s*\n')
+    _SENT_RE = re.compile(r'(?<=[.!?])\s+')
+    _CONN_RE = re.compile(r'\b(and|which|because|so|that)\b(?!\')')
+
     def __init__(self, max_words: int = 23, processed_suffix: str = "_processed"):
 
         self.max_words = max_words
@@ -30,18 +65,7 @@ class SubtitleProcessor:
     # 时间转换
     # =========================
 
-    @staticmethod
-    def time_to_ms(t: str) -> int:
-
-        h, m, rest = t.split(":")
-        s, ms = rest.split(",")
-
-        return (
-                int(h) * 3600000 +
-                int(m) * 60000 +
-                int(s) * 1000 +
-                int(ms)
-        )
+    time_to_ms = staticmethod(time_to_ms)
 
     @staticmethod
     def ms_to_time(ms: int) -> str:
@@ -66,27 +90,20 @@ class SubtitleProcessor:
         subs = []
 
         with open(path, "r", encoding="utf-8") as f:
+            data = f.read()
 
-            block = []
-
-            for line in f:
-
-                line = line.strip()
-
-                if not line:
-
-                    if len(block) >= 3:
-                        idx = int(block[0])
-                        start, end = block[1].split(" --> ")
-                        text = " ".join(block[2:])
+        for block in self._BLOCK_RE.split(data.strip()):
 
-                        subs.append(Subtitle(idx, start, end, text))
+            lines = block.split("\n")
 
-                    block = []
+            if len(lines) < 3:
+                continue
 
-                else:
+            idx = int(lines[0])
+            start, end = lines[1].strip().split(" --> ")
+            text = " ".join(line.strip() for line in lines[2:])
 
-                    block.append(line)
+            subs.append(Subtitle(idx, start, end, text))
 
         return subs
 
@@ -96,29 +113,39 @@ class SubtitleProcessor:
 
     def merge_overlapping(self, subs: List[Subtitle]) -> List[Subtitle]:
 
-        if not subs:
-            return []
+        return list(self._merge_iter(subs))
 
-        merged = []
-        cur = subs[0]
+    @staticmethod
+    def _merge_iter(subs: Iterable[Subtitle]) -> Iterator[Subtitle]:
+
+        it = iter(subs)
+        cur = next(it, None)
+
+        if cur is None:
+            return
 
-        for nxt in subs[1:]:
+        cur_parts = [cur.text]
 
-            if self.time_to_ms(nxt.start) <= self.time_to_ms(cur.end):
+        for nxt in it:
 
-                cur.text += " " + nxt.text
+            if nxt.start_ms <= cur.end_ms:
 
-                if self.time_to_ms(nxt.end) > self.time_to_ms(cur.end):
+                cur_parts.append(nxt.text)
+
+                if nxt.end_ms > cur.end_ms:
                     cur.end = nxt.end
+                    cur.end_ms = nxt.end_ms
 
             else:
 
-                merged.append(cur)
-                cur = nxt
+                cur.text = " ".join(cur_parts)
+                yield cur
 
-        merged.append(cur)
+                cur = nxt
+                cur_parts = [cur.text]
 
-        return merged
+        cur.text = " ".join(cur_parts)
+        yield cur
 
     # =========================
     # 文本切割
@@ -126,7 +153,7 @@ class SubtitleProcessor:
 
     def split_text(self, text: str) -> List[str]:
 
-        parts = re.split(r'(?<=[.!?])\s+', text)
+        parts = self._SENT_RE.split(text)
 
         results = []
 
@@ -136,28 +163,30 @@ class SubtitleProcessor:
 
             if len(words) > self.max_words:
 
-                chunks = re.split(
-                    r'\b(and|which|because|so|that)\b(?!\')',
-                    part
-                )
+                chunks = self._CONN_RE.split(part)
 
-                buf = ""
+                buf_parts = []
+                buf_wc = 0
 
                 for c in chunks:
 
-                    if len((buf + " " + c).split()) > self.max_words:
+                    c_wc = len(c.split())
+
+                    if buf_wc + c_wc > self.max_words:
 
-                        if buf.strip():
-                            results.append(buf.strip())
+                        if buf_wc:
+                            results.append(" ".join(buf_parts).strip())
 
-                        buf = c
+                        buf_parts = [c]
+                        buf_wc = c_wc
 
                     else:
 
-                        buf += " " + c
+                        buf_parts.append(c)
+                        buf_wc += c_wc
 
-                if buf.strip():
-                    results.append(buf.strip())
+                if buf_wc:
+                    results.append(" ".join(buf_parts).strip())
 
             else:
 
@@ -171,8 +200,8 @@ class SubtitleProcessor:
 
     def split_time(self, sub: Subtitle, texts: List[str]) -> List[Subtitle]:
 
-        start_ms = self.time_to_ms(sub.start)
-        end_ms = self.time_to_ms(sub.end)
+        start_ms = sub.start_ms
+        end_ms = sub.end_ms
 
         total_ms = end_ms - start_ms
 
@@ -201,6 +230,11 @@ class SubtitleProcessor:
 
         return result
 
+    def _split_iter(self, merged: Iterable[Subtitle]) -> Iterator[Subtitle]:
+
+        for sub in merged:
+            yield from self.split_time(sub, self.split_text(sub.text))
+
     # =========================
     # 保存SRT
     # =========================
@@ -208,11 +242,13 @@ class SubtitleProcessor:
     @staticmethod
     def save_srt(subs: List[Subtitle], path: str):
 
+        buf = [
+            f"{i}\n{s.start} --> {s.end}\n{s.text}\n\n"
+            for i, s in enumerate(subs, 1)
+        ]
+
         with open(path, "w", encoding="utf-8") as f:
-            for i, s in enumerate(subs, 1):
-                f.write(f"{i}\n")
-                f.write(f"{s.start} --> {s.end}\n")
-                f.write(s.text + "\n\n")
+            f.write("".join(buf))
 
     # =========================
     # 主处理流程
@@ -226,23 +262,12 @@ class SubtitleProcessor:
 
         print("合并ASR碎片...")
 
-        merged = self.merge_overlapping(subs)
-
+        # 合并、切割、时间分配在一次遍历中完成，不生成中间列表
         new_subs = []
 
-        idx = 1
-
-        for sub in merged:
-
-            pieces = self.split_text(sub.text)
-
-            timed = self.split_time(sub, pieces)
-
-            for t in timed:
-                t.idx = idx
-                new_subs.append(t)
-
-                idx += 1
+        for idx, t in enumerate(self._split_iter(self._merge_iter(subs)), 1):
+            t.idx = idx
+            new_subs.append(t)
 
         print(f"字幕处理完成，共 {len(new_subs)} 条")
 
@@ -1,14 +1,8 @@
 import os
-from typing import List
-from dataclasses import dataclass
+from contextlib import contextmanager
+from typing import Iterator, List, TextIO
 
-
-@dataclass
-class Subtitle:
-    idx: int
-    start: str
-    end: str
-    text: str
+from tools.subtitle_processor import Subtitle
 
 
 class SubtitleWriter:
@@ -17,58 +11,49 @@ class SubtitleWriter:
     """
 
     @staticmethod
-    def save_srt(subs: List[Subtitle], path: str):
+    def _format_block(sub: Subtitle, text: str) -> str:
 
-        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return f"{sub.idx}\n{sub.start} --> {sub.end}\n{text}\n\n"
 
-        with open(path, "w", encoding="utf-8") as f:
+    @staticmethod
+    @contextmanager
+    def open_srt(path: str) -> Iterator[TextIO]:
+        """
+        打开字幕文件用于边翻译边写入
 
-            for s in subs:
+        内容先写入 path + ".tmp"，正常结束后才重命名为 path；
+        中途失败时保留 .tmp 文件，不会留下看似完整的字幕
+        """
 
-                f.write(f"{s.idx}\n")
-                f.write(f"{s.start} --> {s.end}\n")
-                f.write(s.text + "\n\n")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
 
-    def write_bilingual(
-        self,
-        original_subs: List[Subtitle],
-        translated: List[str],
-        output_path: str
-    ):
+        tmp_path = path + ".tmp"
 
-        bilingual = []
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            yield f
 
-        for sub, zh in zip(original_subs, translated):
+        os.replace(tmp_path, path)
 
-            bilingual.append(
-                Subtitle(
-                    sub.idx,
-                    sub.start,
-                    sub.end,
-                    sub.text + "\n" + zh
-                )
-            )
+    @classmethod
+    def save_srt(cls, subs: List[Subtitle], path: str):
 
-        self.save_srt(bilingual, output_path)
+        buf = [cls._format_block(s, s.text) for s in subs]
 
-    def write_chinese(
-        self,
-        original_subs: List[Subtitle],
-        translated: List[str],
-        output_path: str
-    ):
+        with cls.open_srt(path) as f:
+            f.write("".join(buf))
 
-        chinese = []
+    def append_bilingual(self, f: TextIO, subs: List[Subtitle], translated: List[str]):
 
-        for sub, zh in zip(original_subs, translated):
+        f.write("".join(
+            self._format_block(sub, sub.text + "\n" + zh)
+            for sub, zh in zip(subs, translated)
+        ))
+        f.flush()
 
-            chinese.append(
-                Subtitle(
-                    sub.idx,
-                    sub.start,
-                    sub.end,
-                    zh
-                )
-            )
+    def append_chinese(self, f: TextIO, subs: List[Subtitle], translated: List[str]):
 
-        self.save_srt(chinese, output_path)
\ No newline at end of file
+        f.write("".join(
+            self._format_block(sub, zh)
+            for sub, zh in zip(subs, translated)
+        ))
+        f.flush()